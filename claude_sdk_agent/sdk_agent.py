@@ -31,6 +31,38 @@ except ImportError:
     pass
 
 
+LOG_LEVELS = {"INFO": logging.INFO, "ERROR": logging.ERROR}
+
+# Sonos MCP tools the agent may call, built once at import
+SONOS_TOOLS = (
+    # Speaker management
+    "mcp__sonos__get_master_speaker",
+    "mcp__sonos__set_master_speaker",
+    # Music search
+    "mcp__sonos__search_for_track",
+    "mcp__sonos__search_for_album",
+    # Queue management
+    "mcp__sonos__add_track_to_queue",
+    "mcp__sonos__add_album_to_queue",
+    "mcp__sonos__add_tracks_to_queue",
+    "mcp__sonos__add_albums_to_queue",
+    "mcp__sonos__list_queue",
+    "mcp__sonos__clear_queue",
+    "mcp__sonos__play_from_queue",
+    # Playback control
+    "mcp__sonos__current_track",
+    "mcp__sonos__play_pause",
+    "mcp__sonos__next_track",
+    # Playlist management
+    "mcp__sonos__add_to_playlist_from_queue",
+    "mcp__sonos__add_to_playlist_from_search",
+    "mcp__sonos__add_playlist_to_queue",
+    "mcp__sonos__list_playlist_tracks",
+    "mcp__sonos__remove_track_from_playlist",
+    "mcp__sonos__poll_job",
+)
+
+
 class SonosSDKAgent:
     """Sonos agent using Claude Agent SDK."""
 
@@ -66,30 +98,7 @@ class SonosSDKAgent:
                     "args": [str(server_path)]
                 }
             },
-            allowed_tools=[
-                # Speaker management
-                "mcp__sonos__get_master_speaker",
-                "mcp__sonos__set_master_speaker",
-                # Music search
-                "mcp__sonos__search_for_track",
-                "mcp__sonos__search_for_album",
-                # Queue management
-                "mcp__sonos__add_track_to_queue",
-                "mcp__sonos__add_album_to_queue",
-                "mcp__sonos__list_queue",
-                "mcp__sonos__clear_queue",
-                "mcp__sonos__play_from_queue",
-                # Playback control
-                "mcp__sonos__current_track",
-                "mcp__sonos__play_pause",
-                "mcp__sonos__next_track",
-                # Playlist management
-                "mcp__sonos__add_to_playlist_from_queue",
-                "mcp__sonos__add_to_playlist_from_search",
-                "mcp__sonos__add_playlist_to_queue",
-                "mcp__sonos__list_playlist_tracks",
-                "mcp__sonos__remove_track_from_playlist"
-            ],
+            allowed_tools=list(SONOS_TOOLS),
             system_prompt=SONOS_SYSTEM_PROMPT,
             # model parameter omitted - uses Claude Code CLI default (Claude Sonnet 4.5)
             permission_mode="bypassPermissions",  # Auto-execute tools without prompting
@@ -122,10 +131,7 @@ class SonosSDKAgent:
     def _log(self, level: str, message: str):
         """Log a message if logging is enabled."""
         if self.logger:
-            if level == "INFO":
-                self.logger.info(message)
-            elif level == "ERROR":
-                self.logger.error(message)
+            self.logger.log(LOG_LEVELS[level], message)
 
     async def chat(self, user_message: str) -> str:
         """
@@ -144,29 +150,34 @@ class SonosSDKAgent:
             # Send query to Claude
             await self.client.query(user_message)
 
-            # Collect response
-            response_text = ""
+            # Collect response text blocks and join them once at the end
+            text_parts = []
 
             # Process all messages until we get the final response
             async for message in self.client.receive_response():
                 if isinstance(message, AssistantMessage):
                     for block in message.content:
                         if isinstance(block, TextBlock):
-                            response_text += block.text
-                        elif isinstance(block, ToolUseBlock) and self.verbose:
-                            # Show tool call in verbose mode
+                            text_parts.append(block.text)
+                        elif isinstance(block, ToolUseBlock) and (self.verbose or self.logger):
+                            # Format the tool call once and reuse it for display and logging
                             params = ", ".join([f"{k}={repr(v)}" for k, v in block.input.items()])
                             tool_name = block.name.replace("mcp__sonos__", "")
-                            print(f"🔧 [TOOL] {tool_name}({params})")
-                            self._log("INFO", f"[TOOL] {tool_name}({params})")
+                            tool_call = f"{tool_name}({params})"
+                            if self.verbose:
+                                print(f"🔧 [TOOL] {tool_call}")
+                            self._log("INFO", f"[TOOL] {tool_call}")
                 elif isinstance(message, ResultMessage):
                     # Capture session ID from result message and log if first time
                     if message.session_id and not self.session_id:
                         self._log("INFO", f"[SESSION_ID] {message.session_id}")
                     self.session_id = message.session_id
 
-            # Log assistant response
-            self._log("INFO", f"[ASSISTANT] {response_text[:1500]}{'...' if len(response_text) > 1500 else ''}")
+            response_text = "".join(text_parts)
+
+            # Log assistant response (skip building the truncated copy when logging is off)
+            if self.logger:
+                self._log("INFO", f"[ASSISTANT] {response_text[:1500]}{'...' if len(response_text) > 1500 else ''}")
 
             return response_text if response_text else "I'm not sure how to respond to that."
 
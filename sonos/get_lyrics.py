@@ -9,14 +9,19 @@ from .config import api_url
 
 scraper = cloudscraper.create_scraper()
 
+# compiled once at import since these run on every lyrics lookup
+# bracketed text plus "Explicit"/"Live" markers, stripped in a single pass
+QUERY_NOISE_RE = re.compile(r"[\(\[].*?[\)\]]|Explicit|Live")
+PRELOADED_STATE_RE = re.compile(r'window\.__PRELOADED_STATE__ = JSON\.parse(.*)')
+LINK_OPEN_RE = re.compile(r"<a href.*\">")
+PARAGRAPH_TAG_RE = re.compile(r"</?p>")
+
 def search_db(title, artist):
     search_url = api_url + '/search'
 
     #remove () or [] which seem to sometimes confuse lyric search
-    q = re.sub("[\(\[].*?[\)\]]", "", title + ' ' + artist)
     # slz addition - explicit is fine but maybe some songs have live as a legitimate word
-    q = q.replace("Explicit", "").replace("Live", "")
-    q = q.strip()
+    q = QUERY_NOISE_RE.sub("", title + ' ' + artist).strip()
 
     #print(f"{search_url=}; {q=}")
 
@@ -35,7 +40,7 @@ def retrieve_lyrics(url):
     except Exception as e:
         return f"Exception retrieving page for\n{url}: {e}"
 
-    m = re.search(r'window\.__PRELOADED_STATE__ = JSON\.parse(.*)', page)
+    m = PRELOADED_STATE_RE.search(page)
     if m is None:
         return f"Could not scrape\n{url}"
 
@@ -47,9 +52,9 @@ def retrieve_lyrics(url):
     data = json.loads(data)
     lyrics = data["songPage"]["lyricsData"]["body"]["html"]
     lyrics = lyrics.replace("<br>n", "\n")
-    lyrics = re.sub(r"<a href.*\">", "", lyrics)
+    lyrics = LINK_OPEN_RE.sub("", lyrics)
     lyrics = lyrics.replace("</a>", "")
-    lyrics = re.sub(r"</?p>", "", lyrics)
+    lyrics = PARAGRAPH_TAG_RE.sub("", lyrics)
     return lyrics[:-2]
 
 def get_lyrics(artist, title, display=False):
@@ -4,18 +4,23 @@ Module that is imported by cli.py that deals with SoCo and Sonos interaction
 
 import os
 from ipaddress import ip_address
-from time import sleep
+from time import sleep, monotonic, time
 import json
 import sys
 import random
+import sqlite3
+import threading
 from operator import itemgetter 
+from collections import OrderedDict
 from typing import Optional, Dict, Any, List, Tuple
 from pathlib import Path
 
 import html
 from urllib.parse import urlparse, quote, unquote
 
+import requests
 import soco
+import soco.services
 from soco.data_structures import DidlAlbum, to_didl_string
 from soco.discovery import by_name
 from soco.music_services import MusicService
@@ -29,6 +34,55 @@ import re
 from unidecode import unidecode
 
 ms = MusicService(music_service)
+
+# recent music service search results keyed by (category, normalized query)
+SEARCH_CACHE_TTL = 60 # seconds
+SEARCH_CACHE_SIZE = 256
+search_cache = OrderedDict()
+
+# searches also persist on disk so they survive server restarts
+SEARCH_DB_TTL = 24 * 60 * 60 # seconds
+search_db_path = Path.home() / ".sonos" / "search_cache.db"
+search_db = None # opened on first use by get_search_db
+search_db_lock = threading.Lock()
+
+# latest search results by results filename, so selecting by position doesn't re-read the file
+last_search = {}
+
+SPOTIFY_URI_RE = re.compile(r"spotify.*[:/](album|track|playlist)[:/](\w+)")
+
+master = None # set by set_master; None until a speaker has been found
+
+# keep-alive sessions for SoCo's SOAP calls to the speakers. requests.Session isn't
+# documented as thread-safe and the MCP server calls SoCo from several worker
+# threads at once, so each thread gets its own session (and connection pool).
+thread_sessions = threading.local()
+
+def get_session():
+    """Return this thread's keep-alive session, creating it on first use."""
+    session = getattr(thread_sessions, "session", None)
+    if session is None:
+        session = thread_sessions.session = requests.Session()
+    return session
+
+class PooledRequests:
+    """Stands in for the requests module in soco.services so its calls go through a per-thread session."""
+    def __getattr__(self, name):
+        return getattr(requests, name)
+
+    def get(self, *args, **kwargs):
+        return get_session().get(*args, **kwargs)
+
+    def post(self, *args, **kwargs):
+        return get_session().post(*args, **kwargs)
+
+    def request(self, *args, **kwargs):
+        return get_session().request(*args, **kwargs)
+
+def use_pooled_session():
+    """Route SoCo service requests through per-thread keep-alive sessions instead of a new connection per call."""
+    if not isinstance(soco.services.requests, PooledRequests):
+        soco.services.requests = PooledRequests()
  
 #def set_master(speaker):
 #     return by_name(speaker)
@@ -193,30 +247,83 @@ def generate_search_fallbacks(query):
     if len(words) <= 2:
         return []
     
-    fallbacks = []
-    
     # Try removing one word at a time, starting from the beginning
-    for i in range(len(words)):
-        if i == 0:
-            # Skip first word
-            fallback = " ".join(words[1:])
-        else:
-            # Remove word at position i
-            fallback = " ".join(words[:i] + words[i+1:])
-        
-        if fallback not in fallbacks:
-            fallbacks.append(fallback)
+    fallbacks = [" ".join(words[:i] + words[i+1:]) for i in range(len(words))]
     
     # Try keeping only the last 2-3 words (often artist name)
     if len(words) >= 3:
-        fallback = " ".join(words[-2:])
-        if fallback not in fallbacks:
-            fallbacks.append(fallback)
+        fallbacks.append(" ".join(words[-2:]))
     
-    return fallbacks
+    # dict keys drop duplicates while keeping the order above
+    return list(dict.fromkeys(fallbacks))
 
-def search_for_track(track):
-    results = ms.search("tracks", track)
+def normalize_query(query):
+    """Lowercase and collapse whitespace so equivalent queries share a cache entry."""
+    return " ".join(query.lower().split())
+
+def cached_search(category, query, fetch):
+    """
+    Return fetch(query), reusing the result of an identical recent search.
+    In-memory entries expire after SEARCH_CACHE_TTL seconds and the least
+    recently used are evicted beyond SEARCH_CACHE_SIZE. On a memory miss the
+    on-disk cache (SEARCH_DB_TTL) is checked before calling fetch.
+    """
+    key = (category, normalize_query(query))
+    entry = search_cache.get(key)
+    if entry and monotonic() - entry[0] < SEARCH_CACHE_TTL:
+        search_cache.move_to_end(key)
+        return entry[1]
+
+    result = load_persisted_search(*key)
+    if result is None:
+        result = fetch(query)
+        # an empty result may be a transient service hiccup, so don't pin it for a day
+        if result:
+            persist_search(*key, result)
+    search_cache[key] = (monotonic(), result)
+    search_cache.move_to_end(key)
+    while len(search_cache) > SEARCH_CACHE_SIZE:
+        search_cache.popitem(last=False)
+    return result
+
+def get_search_db():
+    """Return the shared search cache connection, creating its table on first use. Call with search_db_lock held."""
+    global search_db
+    if search_db is None:
+        search_db_path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(search_db_path, check_same_thread=False)
+        with conn:
+            conn.execute("CREATE TABLE IF NOT EXISTS searches "
+                         "(category TEXT, query TEXT, stored_at REAL, result TEXT, PRIMARY KEY (category, query))")
+        search_db = conn
+    return search_db
+
+def load_persisted_search(category, query):
+    """Return a search result stored less than SEARCH_DB_TTL seconds ago, or None."""
+    try:
+        with search_db_lock:
+            row = get_search_db().execute("SELECT stored_at, result FROM searches WHERE category = ? AND query = ?",
+                                          (category, query)).fetchone()
+    except sqlite3.Error as e:
+        print("Could not read search cache:", e, file=sys.stderr)
+        return None
+    if row and time() - row[0] < SEARCH_DB_TTL:
+        return json.loads(row[1])
+    return None
+
+def persist_search(category, query, result):
+    """Store a search result and drop any rows that have outlived SEARCH_DB_TTL."""
+    now = time()
+    try:
+        with search_db_lock, get_search_db() as conn:
+            conn.execute("INSERT OR REPLACE INTO searches VALUES (?, ?, ?, ?)",
+                         (category, query, now, json.dumps(result)))
+            conn.execute("DELETE FROM searches WHERE stored_at < ?", (now - SEARCH_DB_TTL,))
+    except sqlite3.Error as e:
+        print("Could not write search cache:", e, file=sys.stderr)
+
+def fetch_tracks(query):
+    results = ms.search("tracks", query)
 
     tracks = []
     for track in results:
@@ -230,8 +337,24 @@ def search_for_track(track):
         else:
             uri = html.escape(track.uri) # the uri typically has & which needs to be html entity escaped
             tracks.append({"title":track.title, "artist":"Unknown Artist", "album":"Unknown Album", "item_id":"Unknown item_id", "uri":uri})
-    
+    return tracks
+
+def load_search_results(filename):
+    """
+    Return the results of the latest search. The search_results file is only read
+    when this process hasn't searched yet (e.g. right after a restart).
+    """
+    if filename in last_search:
+        return last_search[filename]
+    file_path = Path.home() / ".sonos" / "search_results" / filename
+    with file_path.open('r') as file:
+        return json.load(file)
+
+def search_for_track(track):
+    tracks = cached_search("tracks", track, fetch_tracks)
+
     filename = "track_search.json"
+    last_search[filename] = tracks
     file_path = Path.home() / ".sonos" / "search_results" / filename
     file_path.parent.mkdir(parents=True, exist_ok=True)
     with file_path.open('w') as file:
@@ -248,10 +371,7 @@ def play_track_from_search_list(position):
     play(True, [track_uris[position-1]]) # add
 
 def add_album_to_queue(position):
-    filename = "album_search.json"
-    file_path = Path.home() / ".sonos" / "search_results" / filename
-    with file_path.open('r') as file:
-        sonos_data = json.load(f)
+    sonos_data = load_search_results("album_search.json")
 
     item_id, uri = sonos_data[position-1]
 
@@ -260,32 +380,35 @@ def add_album_to_queue(position):
     my_add_to_queue(uri, metadata)
 
 def add_track_to_queue(position):
-    filename = "track_search.json"
-    file_path = Path.home() / ".sonos" / "search_results" / filename
-    with file_path.open('r') as file:
-        sonos_data = json.load(file)
+    sonos_data = load_search_results("track_search.json")
 
     t = sonos_data[position-1]
     #Note: the id appears to be necessary for track ddl but not for album ddl
     metadata = SONOS_DIDL.format(item_id=t['item_id'], uri=t['uri'])
     my_add_to_queue(t['uri'], metadata)
 
-def search_for_album(album):
-    results = ms.search("albums", album)
+def fetch_albums(query):
+    results = ms.search("albums", query)
 
     albums = []
-    sonos_data = []
     for album in results:
         album_meta = album.metadata
         artist = album_meta.get('artist', 'Unknown Artist')
         title = album_meta.get('title', 'Unknown Title')
-        albums.append(f"{title} - {artist}")
 
         # Note: for the purpose of creating the DIDL string it appears that the item_id is unnecessary
         item_id = quote(album_meta.get('id')) # the album ids have a # although doesn't seem to need escaping   
-        sonos_data.append([item_id, album.uri])
+        albums.append({"title":title, "artist":artist, "item_id":item_id, "uri":album.uri})
+    return albums
+
+def search_for_album(album):
+    results = cached_search("albums", album, fetch_albums)
+
+    albums = [f"{a['title']} - {a['artist']}" for a in results]
+    sonos_data = [[a['item_id'], a['uri']] for a in results]
 
     filename = "album_search.json"
+    last_search[filename] = sonos_data
     file_path = Path.home() / ".sonos" / "search_results" / filename
     file_path.parent.mkdir(parents=True, exist_ok=True)
     with file_path.open('w') as file:
@@ -295,6 +418,18 @@ def search_for_album(album):
     album_list = "\n".join([f"{a[0]}. {a[1]}" for a in enumerate(albums, start=1)])
     return album_list
 
+def write_file_atomically(file_path, data):
+    """
+    Replace file_path with data (bytes) by writing a fsynced temp file and renaming
+    it into place, so an interrupted write never leaves a truncated playlist behind.
+    """
+    tmp = file_path.with_suffix(file_path.suffix + '.tmp')
+    with tmp.open('wb') as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, file_path)
+
 def add_to_playlist_from_queue(playlist, position):
     queue = master.get_queue()
     if 0 < position <= len(queue):
@@ -318,21 +453,15 @@ def add_to_playlist_from_queue(playlist, position):
             data = json.load(file)
 
         data.append({"title": track.title, "artist": track.creator, "album": track.album, "item_id": directory_path, "uri": uri})
-        with file_path.open('w') as file:
-            json.dump(data, file, indent=2)
     else:
       file_path.parent.mkdir(parents=True, exist_ok=True)
       data = [{"title": track.title, "artist": track.creator, "album": track.album, "item_id": directory_path, "uri": uri}]
-      with file_path.open('w') as file:
-        json.dump(data, file, indent=2)
+    write_file_atomically(file_path, json.dumps(data, indent=2).encode())
 
     return f"Selected track {position}: {track.title} by {track.creator} from the queue and added to playlist {playlist}"
 
 def add_to_playlist_from_search(playlist, position):
-    filename = "track_search.json"
-    file_path = Path.home() / ".sonos" / "search_results" / filename
-    with file_path.open('r') as file:
-        sonos_data = json.load(file)
+    sonos_data = load_search_results("track_search.json")
 
     d = sonos_data[position-1]
 
@@ -344,13 +473,10 @@ def add_to_playlist_from_search(playlist, position):
             data = json.load(file)
 
         data.append(d)
-        with file_path.open('w') as file:
-            json.dump(data, file, indent=2)
     else:
       file_path.parent.mkdir(parents=True, exist_ok=True)
       data = [d]
-      with file_path.open('w') as file:
-        json.dump(data, file, indent=2)
+    write_file_atomically(file_path, json.dumps(data, indent=2).encode())
 
     return f"Selected track {position}: {d["title"]} by {d["artist"]} from the search and added to playlist {playlist}"
 
@@ -382,7 +508,8 @@ def list_playlists():
     if not playlists_dir.exists():
         return "No playlists directory found. Create a playlist first!"
 
-    playlist_files = [f.name for f in playlists_dir.iterdir() if f.is_file()]
+    # .tmp files are partial writes left by an interrupted playlist save
+    playlist_files = [f.name for f in playlists_dir.iterdir() if f.is_file() and f.suffix != '.tmp']
 
     if not playlist_files:
         return "No playlists found. Create a playlist first!"
@@ -403,6 +530,7 @@ def shuffle(artists):
     master.add_to_queue(results[0])
     master.play_from_queue(0)
     tracks.append(results[0].title)
+    artist_words = artists.lower().split() # lowered once rather than per result
     for track in list(results)[1:]:
         # remove dups - not sure how common
         if track.title in tracks:
@@ -419,7 +547,7 @@ def shuffle(artists):
         if not track_artist.isascii():
             track_artist = unidecode(track_artist)
 
-        if any(word in track_artist for word in artists.lower().split()): #added 07092023 
+        if any(word in track_artist for word in artist_words): #added 07092023 
         #if unidecode(track_metadata.metadata.get('artist').lower()) == artists.lower(): #added 07092023 
             try:
                 master.add_to_queue(track)
@@ -480,7 +608,7 @@ def current():
 def extract(uri):
     #print(f"{uri=}")
     # I am storing Spotify uris with colons not %3a
-    match = re.search(r"spotify.*[:/](album|track|playlist)[:/](\w+)", uri)
+    match = SPOTIFY_URI_RE.search(uri)
     spotify_uri = "spotify:" + match.group(1) + ":" + match.group(2)
     #print(f"{spotify_uri=}")
     share_type = spotify_uri.split(":")[1]
@@ -6,9 +6,23 @@ Exposes Sonos control functionality as MCP tools using stdio transport.
 
 import sys
 import json
+import asyncio
+import functools
+import threading
+import uuid
+from contextlib import asynccontextmanager
 from pathlib import Path
-from time import sleep
-from mcp.server.fastmcp import FastMCP
+from time import sleep, monotonic
+from typing import Annotated
+from mcp.server.fastmcp import FastMCP, Context
+from pydantic import Field
+from soco import SoCo
+
+# orjson is optional; playlist I/O falls back to the stdlib json module
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 # Add parent directory to path to import sonos modules
 sys.path.insert(0, str(Path(__file__).parent.parent))
@@ -16,47 +30,348 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 from sonos import sonos_actions
 from sonos.config import master_speaker
 
+@asynccontextmanager
+async def server_lifespan(server):
+    """
+    Keep stray print() output off the JSON-RPC stream while the server runs.
+
+    By the time the lifespan is entered the stdio transport has already wrapped
+    the real stdout, so pointing sys.stdout at stderr only redirects prints from
+    library code (sonos_actions reports SoCo errors with print). The startup
+    speaker connection is started here so its output is redirected too.
+    """
+    protocol_stdout = sys.stdout
+    sys.stdout = sys.stderr
+    threading.Thread(target=connect_on_startup, daemon=True).start()
+    try:
+        yield
+    finally:
+        sys.stdout = protocol_stdout
+
+
 # Initialize FastMCP server
-mcp = FastMCP("sonos-mcp-server")
+mcp = FastMCP("sonos-mcp-server", lifespan=server_lifespan)
+
+# Argument types whose ranges FastMCP validates before a tool body runs
+Position = Annotated[int, Field(ge=1)]
+VolumeLevel = Annotated[int, Field(ge=0, le=100)]
+
+# Short-lived cache for the speaker state probes (current track, queue) that the
+# agent tends to repeat within a single workflow. Cleared by every tool that
+# changes playback or the queue.
+STATE_CACHE_TTL = 2.0  # seconds
+# The playing track moves on by itself, so it is only reused for rapid repeat calls
+CURRENT_TRACK_TTL = 0.5  # seconds
+_state_cache = {}
+# Bumped by invalidate_state so a fetch that overlapped a change doesn't cache stale state
+_state_version = 0
+_state_lock = threading.Lock()
+
+
+def cached_state(key, fetch, ttl=STATE_CACHE_TTL):
+    """Return fetch(), reusing a result cached less than ttl seconds ago."""
+    entry = _state_cache.get(key)
+    if entry and monotonic() - entry[0] < ttl:
+        return entry[1]
+    version = _state_version
+    value = fetch()
+    with _state_lock:
+        if version == _state_version:
+            _state_cache[key] = (monotonic(), value)
+    return value
+
+
+def invalidate_state():
+    """Drop cached speaker state after a playback or queue change."""
+    global _state_version
+    with _state_lock:
+        _state_version += 1
+        _state_cache.clear()
+
+
+def format_tracks(tracks, start=1):
+    """Format track dicts as a numbered "title - artist - album" list, numbering from start."""
+    return "\n".join([
+        f"{num}. {track.get('title', 'Unknown')} - {track.get('artist', 'Unknown')} - {track.get('album', 'Unknown')}"
+        for num, track in enumerate(tracks, start=start)
+    ])
+
+
+PLAYLISTS_DIR = Path.home() / ".sonos" / "playlists"
+PROGRESS_CHUNK = 50  # playlist rows formatted per progress notification
+
+
+def playlist_path(name):
+    """
+    Return the file for a saved playlist, refusing names that would point outside
+    PLAYLISTS_DIR (or at the directory itself). Every tool that takes a playlist
+    name checks it here before the name reaches sonos_actions. Names ending in
+    .tmp are refused too: those are in-progress writes that list_playlists hides.
+    """
+    if not name or Path(name).name != name or name == ".." or name.endswith(".tmp"):
+        raise ValueError(f"Invalid playlist name: {name!r}")
+    return PLAYLISTS_DIR / name
 
 
-def initialize_speaker(max_retries=10):
-    """Initialize Sonos speaker connection with retry logic."""
-    for attempt in range(max_retries):
-        try:
-            speaker = sonos_actions.set_master(master_speaker)
-            if speaker:
-                print(f"Successfully connected to speaker: {master_speaker}", file=sys.stderr)
-                return speaker
-        except Exception as e:
-            if attempt < max_retries - 1:
-                print(f"Speaker discovery attempt {attempt + 1}/{max_retries} failed: {e}", file=sys.stderr)
-                sleep(1)
-            else:
-                print(f"ERROR: Failed to connect to speaker '{master_speaker}' after {max_retries} attempts", file=sys.stderr)
-                raise
+# Parsed playlists keyed by path, validated against the file's mtime and size
+_playlist_cache = {}
+
+
+def load_playlist(file_path):
+    """Return the parsed playlist at file_path, re-reading only when the file has changed."""
+    st = file_path.stat()
+    stamp = (st.st_mtime_ns, st.st_size)
+    entry = _playlist_cache.get(file_path)
+    if entry and entry[0] == stamp:
+        return entry[1]
+    data = file_path.read_bytes()
+    tracks = orjson.loads(data) if orjson else json.loads(data)
+    _playlist_cache[file_path] = (stamp, tracks)
+    return tracks
+
+
+def save_playlist(file_path, tracks):
+    """Atomically write tracks to file_path and refresh its cache entry without re-reading."""
+    if orjson:
+        data = orjson.dumps(tracks, option=orjson.OPT_INDENT_2)
+    else:
+        data = json.dumps(tracks, indent=2).encode()
+    sonos_actions.write_file_atomically(file_path, data)
+    st = file_path.stat()
+    _playlist_cache[file_path] = ((st.st_mtime_ns, st.st_size), tracks)
+
+
+# Serializes connection attempts between the startup thread and tool calls
+_speaker_lock = threading.Lock()
+
+# Speaker to connect and reconnect to: the configured master until set_master_speaker picks another
+target_speaker = master_speaker
+
+# Last known IP address of the configured master speaker, so reconnecting can skip discovery
+MASTER_IP_CACHE = Path.home() / ".sonos" / "master_ip"
+
+
+def connect_cached_ip():
+    """Connect directly to the target speaker's last known address, or return None."""
+    if not MASTER_IP_CACHE.is_file():
+        return None
+    try:
+        speaker = SoCo(MASTER_IP_CACHE.read_text().strip())
+        # a short timeout so a stale address falls back to discovery quickly
+        if speaker.get_speaker_info(refresh=True, timeout=3).get('zone_name') == target_speaker:
+            sonos_actions.master = speaker
+            return speaker
+    except Exception as e:
+        print(f"Cached speaker address not usable: {e}", file=sys.stderr)
     return None
 
 
-# Initialize speaker connection on startup
-try:
-    initialize_speaker()
-except Exception as e:
-    print(f"WARNING: Could not initialize speaker on startup: {e}", file=sys.stderr)
-    print("Speaker initialization will be retried on first tool call", file=sys.stderr)
+def remember_ip(speaker):
+    """Atomically record the speaker's address for the next startup."""
+    try:
+        MASTER_IP_CACHE.parent.mkdir(parents=True, exist_ok=True)
+        tmp = MASTER_IP_CACHE.with_suffix('.tmp')
+        tmp.write_text(speaker.ip_address)
+        tmp.replace(MASTER_IP_CACHE)
+    except OSError as e:
+        print(f"Could not cache speaker address: {e}", file=sys.stderr)
+
+
+def initialize_speaker(max_retries=5):
+    """
+    Connect to the target speaker unless already connected.
+    Tries the cached address first, then discovery with exponential backoff
+    (1s, 2s, 4s, ... capped at 10s).
+    """
+    with _speaker_lock:
+        if sonos_actions.master is not None:
+            return sonos_actions.master
+        name = target_speaker
+        speaker = connect_cached_ip()
+        if speaker:
+            print(f"Successfully connected to speaker: {name} (cached address)", file=sys.stderr)
+            sonos_actions.use_pooled_session()
+            return speaker
+        for attempt in range(max_retries):
+            try:
+                speaker = sonos_actions.set_master(name)
+            except Exception as e:
+                error = e
+            else:
+                if speaker:
+                    # another speaker was chosen while discovery ran; keep that choice
+                    if sonos_actions.master is not speaker or target_speaker != name:
+                        return sonos_actions.master
+                    print(f"Successfully connected to speaker: {name}", file=sys.stderr)
+                    sonos_actions.use_pooled_session()
+                    remember_ip(speaker)
+                    return speaker
+                error = "speaker not found"
+            if attempt < max_retries - 1:
+                print(f"Speaker discovery attempt {attempt + 1}/{max_retries} failed: {error}", file=sys.stderr)
+                sleep(min(2 ** attempt, 10))
+        print(f"ERROR: Failed to connect to speaker '{name}' after {max_retries} attempts", file=sys.stderr)
+        raise ConnectionError(f"Could not connect to speaker '{name}': {error}")
+
+
+def switch_speaker(speaker_name):
+    """
+    Make speaker_name the master, keeping the current speaker if it can't be found.
+    Holds _speaker_lock so a (re)connect can't overwrite the choice.
+    """
+    global target_speaker
+    with _speaker_lock:
+        previous = sonos_actions.master
+        new_master = sonos_actions.set_master(speaker_name)
+        if not new_master:
+            sonos_actions.master = previous
+            return None
+        target_speaker = speaker_name
+        sonos_actions.use_pooled_session()
+        return new_master
+
+
+def connect_on_startup():
+    """Make a single connection attempt without holding up the stdio transport."""
+    try:
+        initialize_speaker(max_retries=1)
+    except Exception as e:
+        print(f"WARNING: Could not initialize speaker on startup: {e}", file=sys.stderr)
+        print("Speaker initialization will be retried on first tool call", file=sys.stderr)
+
+
+# Longest a single SoCo call may block a tool before the speaker is treated as hung
+SPEAKER_TIMEOUT = 8.0
+_reconnect_task = None
+_stalled_calls = set()  # timed-out speaker calls whose worker threads are still running
+
+
+class SpeakerUnresponsive(Exception):
+    """Raised by speaker_call when the speaker doesn't answer within its timeout."""
+
+    def __init__(self):
+        super().__init__("Speaker unresponsive; retrying in background")
+
+
+async def reconnect_speaker():
+    """Rediscover the target speaker after a call to it timed out."""
+    try:
+        await asyncio.to_thread(initialize_speaker)
+    except Exception as e:
+        print(f"WARNING: Background reconnect failed: {e}", file=sys.stderr)
+
+
+def speaker_recovering():
+    """True while a reconnect or a timed-out call is still in progress."""
+    return bool(_stalled_calls) or (_reconnect_task is not None and not _reconnect_task.done())
+
+
+def release_stalled(task):
+    """Forget a timed-out call once its worker thread has finally returned."""
+    _stalled_calls.discard(task)
+    if not task.cancelled() and task.exception():
+        print(f"Timed-out speaker call later failed: {task.exception()!r}", file=sys.stderr)
+
+
+async def ensure_speaker():
+    """Connect to the master speaker if startup didn't, before a tool needs it."""
+    if speaker_recovering():
+        raise SpeakerUnresponsive()
+    if sonos_actions.master is None:
+        await asyncio.to_thread(initialize_speaker)
+
+
+async def speaker_call(fn, *args, timeout=SPEAKER_TIMEOUT):
+    """
+    Run a blocking SoCo call in a worker thread, giving up after timeout seconds.
+
+    Threads can't be cancelled, so a timed-out call keeps running after its tool
+    has returned and released _write_lock. Until it finishes, and until the
+    background reconnect started here is done, every speaker call fails fast
+    with SpeakerUnresponsive; that keeps later tools from interleaving SoCo
+    calls with the stalled one.
+    """
+    global _reconnect_task
+    if speaker_recovering():
+        raise SpeakerUnresponsive()
+    task = asyncio.ensure_future(asyncio.to_thread(fn, *args))
+    try:
+        # shield so the task stays pending, and tracked, while the thread runs on
+        return await asyncio.wait_for(asyncio.shield(task), timeout)
+    except asyncio.TimeoutError:
+        print(f"{getattr(fn, '__name__', fn)} timed out after {timeout}s", file=sys.stderr)
+        _stalled_calls.add(task)
+        task.add_done_callback(release_stalled)
+        if _reconnect_task is None or _reconnect_task.done():
+            sonos_actions.master = None
+            invalidate_state()
+            _reconnect_task = asyncio.create_task(reconnect_speaker())
+        raise SpeakerUnresponsive() from None
+
+
+# Read-only tools may run concurrently (bounded); tools that change speaker,
+# queue, playlist or search-result state run one at a time so their SoCo calls
+# and file writes don't interleave.
+_read_sem = asyncio.Semaphore(8)
+_write_lock = asyncio.Lock()
+
+
+def read_op(fn):
+    """Run a read-only tool under the shared read semaphore."""
+    @functools.wraps(fn)
+    async def wrapper(*args, **kwargs):
+        async with _read_sem:
+            return await fn(*args, **kwargs)
+    return wrapper
+
+
+def write_op(fn):
+    """Run a state-changing tool under the exclusive write lock."""
+    @functools.wraps(fn)
+    async def wrapper(*args, **kwargs):
+        async with _write_lock:
+            return await fn(*args, **kwargs)
+    return wrapper
+
+
+def safe_tool(message):
+    """
+    Turn any exception raised by a tool into a "<message>: <error>" reply for
+    the client, logging it to stderr.
+    """
+    def decorator(fn):
+        @functools.wraps(fn)
+        async def wrapper(*args, **kwargs):
+            try:
+                return await fn(*args, **kwargs)
+            except SpeakerUnresponsive as e:
+                return str(e)
+            except Exception as e:
+                print(f"{fn.__name__} failed: {e!r}", file=sys.stderr)
+                return f"{message}: {str(e)}"
+        return wrapper
+    return decorator
 
 
 # Speaker Management Tools
 
 @mcp.tool()
+@safe_tool("Failed to get master speaker")
+@read_op
 async def get_master_speaker() -> str:
     """Get the currently configured master speaker name."""
-    if sonos_actions.master:
-        return f"Current master speaker: {sonos_actions.master.player_name}"
-    return "No master speaker currently connected"
+    # a status check: report the current connection rather than starting one
+    master = sonos_actions.master
+    if master is None:
+        return "No master speaker currently connected"
+    # player_name queries the speaker, so keep it off the event loop
+    name = await speaker_call(lambda: master.player_name)
+    return f"Current master speaker: {name}"
 
 
 @mcp.tool()
+@safe_tool("Error changing master speaker")
+@write_op
 async def set_master_speaker(speaker_name: str) -> str:
     """
     Change the master speaker to a different Sonos device.
@@ -64,20 +379,23 @@ async def set_master_speaker(speaker_name: str) -> str:
     Args:
         speaker_name: Name of the Sonos speaker to use as master
     """
-    try:
-        new_master = sonos_actions.set_master(speaker_name)
-        if new_master:
-            sonos_actions.master = new_master
-            return f"Successfully changed master speaker to: {speaker_name}"
-        else:
-            return f"Failed to find speaker named: {speaker_name}"
-    except Exception as e:
-        return f"Error changing master speaker: {str(e)}"
+    # don't swap speakers under a reconnect or a timed-out call that is still running
+    if speaker_recovering():
+        raise SpeakerUnresponsive()
+    # discovery can legitimately take longer than SPEAKER_TIMEOUT, so it runs unbounded
+    new_master = await asyncio.to_thread(switch_speaker, speaker_name)
+    if new_master:
+        invalidate_state()
+        return f"Successfully changed master speaker to: {speaker_name}"
+    else:
+        return f"Failed to find speaker named: {speaker_name}"
 
 
 # Music Search Tools
 
 @mcp.tool()
+@safe_tool("Failed to search for track")
+@write_op  # publishes the results that later positions refer to
 async def search_for_track(query: str) -> str:
     """
     Search for music tracks by title, artist, or both.
@@ -86,14 +404,13 @@ async def search_for_track(query: str) -> str:
     Args:
         query: Search query (e.g., "Heart of Gold Neil Young")
     """
-    try:
-        result = sonos_actions.search_for_track(query)
-        return result
-    except Exception as e:
-        return f"Failed to search for track: {str(e)}"
+    result = await asyncio.to_thread(sonos_actions.search_for_track, query)
+    return result
 
 
 @mcp.tool()
+@safe_tool("Failed to search for album")
+@write_op  # publishes the results that later positions refer to
 async def search_for_album(query: str) -> str:
     """
     Search for music albums by title or artist.
@@ -102,130 +419,190 @@ async def search_for_album(query: str) -> str:
     Args:
         query: Search query (e.g., "Harvest Moon" or "Neil Young")
     """
-    try:
-        result = sonos_actions.search_for_album(query)
-        return result
-    except Exception as e:
-        return f"Failed to search for album: {str(e)}"
+    result = await asyncio.to_thread(sonos_actions.search_for_album, query)
+    return result
 
 
 # Queue Management Tools
 
 @mcp.tool()
-async def add_track_to_queue(position: int) -> str:
+@safe_tool("Failed to add track to queue")
+@write_op
+async def add_track_to_queue(position: Position) -> str:
     """
     Select a track from search results by its number and add it to the Sonos queue.
+    Positions refer to the most recent search_for_track results.
 
     Args:
         position: The number of the track from search results (1-indexed)
     """
-    try:
-        sonos_actions.add_track_to_queue(position)
-        return f"Successfully added track {position} to the queue"
-    except Exception as e:
-        return f"Failed to add track to queue: {str(e)}"
+    await ensure_speaker()
+    await speaker_call(sonos_actions.add_track_to_queue, position)
+    invalidate_state()
+    return f"Successfully added track {position} to the queue"
 
 
 @mcp.tool()
-async def add_album_to_queue(position: int) -> str:
+@safe_tool("Failed to add album to queue")
+@write_op
+async def add_album_to_queue(position: Position) -> str:
     """
     Select an album from search results by its number and add it to the Sonos queue.
+    Positions refer to the most recent search_for_album results.
 
     Args:
         position: The number of the album from search results (1-indexed)
     """
-    try:
-        sonos_actions.add_album_to_queue(position)
-        return f"Successfully added album {position} to the queue"
-    except Exception as e:
-        return f"Failed to add album to queue: {str(e)}"
+    await ensure_speaker()
+    await speaker_call(sonos_actions.add_album_to_queue, position)
+    invalidate_state()
+    return f"Successfully added album {position} to the queue"
+
+
+def add_positions(add, positions):
+    """Call add for each position in order, returning descriptions of any that failed."""
+    failures = []
+    for position in positions:
+        try:
+            add(position)
+        except Exception as e:
+            failures.append(f"{position} ({str(e)})")
+    return failures
+
+
+def summarize_batch(kind, positions, failures):
+    added = len(positions) - len(failures)
+    summary = f"Added {added} of {len(positions)} {kind} to the queue"
+    if failures:
+        summary += f". Failed: {', '.join(failures)}"
+    return summary
+
+
+@mcp.tool()
+@safe_tool("Failed to add tracks to queue")
+@write_op
+async def add_tracks_to_queue(positions: list[Position]) -> str:
+    """
+    Select several tracks from search results by their numbers and add them all to the Sonos queue in one call.
+    Positions refer to the most recent search_for_track results.
+
+    Args:
+        positions: The numbers of the tracks from search results (1-indexed), in the order to queue them
+    """
+    if not positions:
+        return "No tracks given to add"
+    await ensure_speaker()
+    failures = await speaker_call(add_positions, sonos_actions.add_track_to_queue, positions,
+                                  timeout=SPEAKER_TIMEOUT * len(positions))
+    invalidate_state()
+    return summarize_batch("tracks", positions, failures)
 
 
 @mcp.tool()
+@safe_tool("Failed to add albums to queue")
+@write_op
+async def add_albums_to_queue(positions: list[Position]) -> str:
+    """
+    Select several albums from search results by their numbers and add them all to the Sonos queue in one call.
+    Positions refer to the most recent search_for_album results.
+
+    Args:
+        positions: The numbers of the albums from search results (1-indexed), in the order to queue them
+    """
+    if not positions:
+        return "No albums given to add"
+    await ensure_speaker()
+    failures = await speaker_call(add_positions, sonos_actions.add_album_to_queue, positions,
+                                  timeout=SPEAKER_TIMEOUT * len(positions))
+    invalidate_state()
+    return summarize_batch("albums", positions, failures)
+
+
+@mcp.tool()
+@safe_tool("Failed to get queue")
+@read_op
 async def list_queue() -> str:
     """Display the current Sonos queue showing all queued tracks."""
-    try:
-        queue = sonos_actions.list_queue()
-        if not queue:
-            return "The queue is empty"
-
-        # Format the queue into a numbered list
-        queue_lines = []
-        for num, track in enumerate(queue, start=1):
-            title = track.get('title', 'Unknown')
-            artist = track.get('artist', 'Unknown')
-            album = track.get('album', 'Unknown')
-            queue_lines.append(f"{num}. {title} - {artist} - {album}")
-
-        return "\n".join(queue_lines)
-    except Exception as e:
-        return f"Failed to get queue: {str(e)}"
+    await ensure_speaker()
+    queue = await speaker_call(cached_state, "queue", sonos_actions.list_queue)
+    if not queue:
+        return "The queue is empty"
+
+    return format_tracks(queue)
 
 
 @mcp.tool()
+@safe_tool("Failed to clear queue")
+@write_op
 async def clear_queue() -> str:
     """Clear all tracks from the current queue."""
-    try:
-        sonos_actions.clear_queue()
-        return "Queue cleared"
-    except Exception as e:
-        return f"Failed to clear queue: {str(e)}"
+    await ensure_speaker()
+    await speaker_call(sonos_actions.clear_queue)
+    invalidate_state()
+    return "Queue cleared"
 
 
 @mcp.tool()
-async def play_from_queue(position: int) -> str:
+@safe_tool("Failed to play from queue")
+@write_op
+async def play_from_queue(position: Position) -> str:
     """
     Play a track by its number in the Sonos queue.
 
     Args:
         position: The track number in the queue (1-indexed)
     """
-    try:
-        # Convert from 1-indexed (user-friendly) to 0-indexed (SoCo internal)
-        sonos_actions.play_from_queue(position - 1)
-        return f"Now playing track {position} from the queue"
-    except Exception as e:
-        return f"Failed to play from queue: {str(e)}"
+    await ensure_speaker()
+    # Convert from 1-indexed (user-friendly) to 0-indexed (SoCo internal)
+    await speaker_call(sonos_actions.play_from_queue, position - 1)
+    invalidate_state()
+    return f"Now playing track {position} from the queue"
 
 
 # Playback Control Tools
 
 @mcp.tool()
+@safe_tool("Failed to get current track info")
+@read_op
 async def current_track() -> str:
     """Get information about what's currently playing on Sonos."""
-    try:
-        result = sonos_actions.current_track_info(text=True)
-        if result:
-            return result
-        else:
-            return "Nothing appears to be playing"
-    except Exception as e:
-        return f"Failed to get current track info: {str(e)}"
+    await ensure_speaker()
+    result = await speaker_call(
+        cached_state, "current_track", lambda: sonos_actions.current_track_info(text=True),
+        CURRENT_TRACK_TTL)
+    if result:
+        return result
+    else:
+        return "Nothing appears to be playing"
 
 
 @mcp.tool()
+@safe_tool("Failed to toggle play/pause")
+@write_op
 async def play_pause() -> str:
     """Toggle play/pause of the current track."""
-    try:
-        sonos_actions.play_pause()
-        return "Toggled play/pause"
-    except Exception as e:
-        return f"Failed to toggle play/pause: {str(e)}"
+    await ensure_speaker()
+    await speaker_call(sonos_actions.play_pause)
+    invalidate_state()
+    return "Toggled play/pause"
 
 
 @mcp.tool()
+@safe_tool("Failed to skip track")
+@write_op
 async def next_track() -> str:
     """Skip to the next track in the queue."""
-    try:
-        sonos_actions.playback('next')
-        return "Skipped to next track"
-    except Exception as e:
-        return f"Failed to skip track: {str(e)}"
+    await ensure_speaker()
+    await speaker_call(sonos_actions.playback, 'next')
+    invalidate_state()
+    return "Skipped to next track"
 
 
 # Volume Control Tools
 
 @mcp.tool()
+@safe_tool("Failed to adjust volume")
+@write_op
 async def turn_volume(direction: str) -> str:
     """
     Adjust volume up or down by 10 for all speakers in the group.
@@ -233,32 +610,30 @@ async def turn_volume(direction: str) -> str:
     Args:
         direction: "louder" to increase volume, "quieter" to decrease volume
     """
-    try:
-        sonos_actions.turn_volume(direction)
-        change = "increased" if direction != "quieter" else "decreased"
-        return f"Volume {change} by 10"
-    except Exception as e:
-        return f"Failed to adjust volume: {str(e)}"
+    await ensure_speaker()
+    await speaker_call(sonos_actions.turn_volume, direction)
+    change = "increased" if direction != "quieter" else "decreased"
+    return f"Volume {change} by 10"
 
 
 @mcp.tool()
-async def set_volume(level: int) -> str:
+@safe_tool("Failed to set volume")
+@write_op
+async def set_volume(level: VolumeLevel) -> str:
     """
     Set the absolute volume level for all speakers in the group.
 
     Args:
         level: Volume level from 0 (muted) to 100 (maximum)
     """
-    try:
-        if level < 0 or level > 100:
-            return "Volume level must be between 0 and 100"
-        sonos_actions.set_volume(level)
-        return f"Volume set to {level}"
-    except Exception as e:
-        return f"Failed to set volume: {str(e)}"
+    await ensure_speaker()
+    await speaker_call(sonos_actions.set_volume, level)
+    return f"Volume set to {level}"
 
 
 @mcp.tool()
+@safe_tool("Failed to change mute status")
+@write_op
 async def mute(muted: bool) -> str:
     """
     Mute or unmute all speakers in the group.
@@ -266,18 +641,18 @@ async def mute(muted: bool) -> str:
     Args:
         muted: True to mute, False to unmute
     """
-    try:
-        sonos_actions.mute(muted)
-        status = "muted" if muted else "unmuted"
-        return f"Speakers {status}"
-    except Exception as e:
-        return f"Failed to change mute status: {str(e)}"
+    await ensure_speaker()
+    await speaker_call(sonos_actions.mute, muted)
+    status = "muted" if muted else "unmuted"
+    return f"Speakers {status}"
 
 
 # Playlist Management Tools
 
 @mcp.tool()
-async def add_to_playlist_from_queue(playlist: str, position: int) -> str:
+@safe_tool("Failed to add track from queue to playlist")
+@write_op
+async def add_to_playlist_from_queue(playlist: str, position: Position) -> str:
     """
     Select a track from the Sonos queue by its number and add it to the specified playlist.
 
@@ -285,94 +660,156 @@ async def add_to_playlist_from_queue(playlist: str, position: int) -> str:
         playlist: Name of the playlist to add the track to
         position: The track number in the queue (1-indexed)
     """
-    try:
-        result = sonos_actions.add_to_playlist_from_queue(playlist, position)
-        return result
-    except Exception as e:
-        return f"Failed to add track from queue to playlist: {str(e)}"
+    playlist_path(playlist)
+    await ensure_speaker()
+    result = await speaker_call(sonos_actions.add_to_playlist_from_queue, playlist, position)
+    return result
 
 
 @mcp.tool()
-async def add_to_playlist_from_search(playlist: str, position: int) -> str:
+@safe_tool("Failed to add track from search to playlist")
+@write_op
+async def add_to_playlist_from_search(playlist: str, position: Position) -> str:
     """
     Select a track from search results by its number and add it to the specified playlist.
+    Positions refer to the most recent search_for_track results.
 
     Args:
         playlist: Name of the playlist to add the track to
         position: The track number from search results (1-indexed)
     """
+    playlist_path(playlist)
+    result = await asyncio.to_thread(sonos_actions.add_to_playlist_from_search, playlist, position)
+    return result
+
+
+# Background jobs for long-running tools, keyed by job id
+JOB_WAIT_TIMEOUT = 5.0  # seconds to wait for a job before handing back its id
+JOB_RESULT_TTL = 600.0  # seconds a finished job's result is kept for poll_job
+_jobs = {}
+_job_tasks = set()  # strong references so running tasks aren't garbage collected
+
+
+async def run_playlist_job(job_id, playlist):
+    """Add a playlist to the queue and record the outcome in _jobs."""
+    job = _jobs[job_id]
     try:
-        result = sonos_actions.add_to_playlist_from_search(playlist, position)
-        return result
+        async with _write_lock:
+            await ensure_speaker()
+            # one AddURIToQueue call per track, so the timeout scales with the playlist
+            file_path = playlist_path(playlist)
+            count = len(await asyncio.to_thread(load_playlist, file_path)) if file_path.is_file() else 0
+            job["result"] = await speaker_call(sonos_actions.add_playlist_to_queue, playlist,
+                                               timeout=SPEAKER_TIMEOUT * max(count, 1))
+            invalidate_state()
+        job["status"] = "done"
     except Exception as e:
-        return f"Failed to add track from search to playlist: {str(e)}"
+        job["result"] = f"Failed to add playlist to queue: {str(e)}"
+        job["status"] = "failed"
+    job["finished_at"] = monotonic()
+
+
+def expire_jobs():
+    """Drop finished jobs whose results nobody polled for within JOB_RESULT_TTL."""
+    cutoff = monotonic() - JOB_RESULT_TTL
+    for job_id in [j for j, job in _jobs.items() if job.get("finished_at", cutoff) < cutoff]:
+        del _jobs[job_id]
 
 
 @mcp.tool()
 async def add_playlist_to_queue(playlist: str) -> str:
     """
     Add a named playlist to the Sonos queue.
+    Large playlists continue in the background: if the result is a job id,
+    call poll_job with it to find out when the tracks have been added.
 
     Args:
         playlist: Name of the saved playlist
     """
     try:
-        result = sonos_actions.add_playlist_to_queue(playlist)
-        return result
-    except Exception as e:
+        playlist_path(playlist)
+    except ValueError as e:
         return f"Failed to add playlist to queue: {str(e)}"
+    expire_jobs()
+    job_id = uuid.uuid4().hex
+    _jobs[job_id] = {"status": "running", "playlist": playlist}
+    task = asyncio.create_task(run_playlist_job(job_id, playlist))
+    _job_tasks.add(task)
+    task.add_done_callback(_job_tasks.discard)
+
+    # Most playlists finish quickly, so answer directly when we can
+    await asyncio.wait({task}, timeout=JOB_WAIT_TIMEOUT)
+    if task.done():
+        return _jobs.pop(job_id)["result"]
+    return (f"Started job {job_id} adding playlist '{playlist}' to the queue. "
+            "Use poll_job to check when it has finished.")
+
+
+@mcp.tool()
+async def poll_job(job_id: str) -> str:
+    """
+    Check on a background job started by add_playlist_to_queue.
+
+    Args:
+        job_id: The job id returned when the job was started
+    """
+    expire_jobs()
+    job = _jobs.get(job_id)
+    if job is None:
+        return f"No job found with id {job_id}"
+    if job["status"] == "running":
+        return f"Job {job_id} is still adding playlist '{job['playlist']}' to the queue"
+    return _jobs.pop(job_id)["result"]
 
 
 @mcp.tool()
+@safe_tool("Failed to list playlists")
+@read_op
 async def list_playlists() -> str:
     """
     List all available playlists.
     Returns a numbered list of all saved playlists.
     """
-    try:
-        result = sonos_actions.list_playlists()
-        return result
-    except Exception as e:
-        return f"Failed to list playlists: {str(e)}"
+    result = await asyncio.to_thread(sonos_actions.list_playlists)
+    return result
 
 
 @mcp.tool()
-async def list_playlist_tracks(playlist: str) -> str:
+@safe_tool("Failed to read playlist")
+@read_op
+async def list_playlist_tracks(playlist: str, ctx: Context) -> str:
     """
     Display all tracks in a saved playlist by name.
 
     Args:
         playlist: Name of the playlist to display
     """
-    try:
-        playlist_name = playlist
-        file_path = Path.home() / ".sonos" / "playlists" / playlist_name
+    playlist_name = playlist
+    file_path = playlist_path(playlist_name)
 
-        if not file_path.is_file():
-            return f"Playlist '{playlist_name}' does not exist"
+    if not file_path.is_file():
+        return f"Playlist '{playlist_name}' does not exist"
 
-        with file_path.open('r') as file:
-            tracks = json.load(file)
+    tracks = await asyncio.to_thread(load_playlist, file_path)
 
-        if not tracks:
-            return f"Playlist '{playlist_name}' is empty"
+    if not tracks:
+        return f"Playlist '{playlist_name}' is empty"
 
-        # Format tracks into a numbered list
-        track_lines = []
-        for num, track in enumerate(tracks, start=1):
-            title = track.get('title', 'Unknown')
-            artist = track.get('artist', 'Unknown')
-            album = track.get('album', 'Unknown')
-            track_lines.append(f"{num}. {title} - {artist} - {album}")
+    # Format in chunks so clients that asked for progress see long playlists advancing
+    total = len(tracks)
+    chunks = []
+    for start in range(0, total, PROGRESS_CHUNK):
+        chunks.append(format_tracks(tracks[start:start + PROGRESS_CHUNK], start=start + 1))
+        await ctx.report_progress(min(start + PROGRESS_CHUNK, total), total)
 
-        header = f"Playlist '{playlist_name}' ({len(tracks)} tracks):\n"
-        return header + "\n".join(track_lines)
-    except Exception as e:
-        return f"Failed to read playlist: {str(e)}"
+    header = f"Playlist '{playlist_name}' ({total} tracks):\n"
+    return header + "\n".join(chunks)
 
 
 @mcp.tool()
-async def remove_track_from_playlist(playlist: str, position: int) -> str:
+@safe_tool("Failed to remove track from playlist")
+@write_op
+async def remove_track_from_playlist(playlist: str, position: Position) -> str:
     """
     Remove a track from a saved playlist by its position number.
 
@@ -380,36 +817,32 @@ async def remove_track_from_playlist(playlist: str, position: int) -> str:
         playlist: Name of the playlist
         position: The track number to remove (1-indexed)
     """
-    try:
-        playlist_name = playlist
-        file_path = Path.home() / ".sonos" / "playlists" / playlist_name
+    playlist_name = playlist
+    file_path = playlist_path(playlist_name)
 
-        if not file_path.is_file():
-            return f"Playlist '{playlist_name}' does not exist"
+    if not file_path.is_file():
+        return f"Playlist '{playlist_name}' does not exist"
 
-        with file_path.open('r') as file:
-            tracks = json.load(file)
+    # Copy so the cached list is untouched if the write fails
+    tracks = list(await asyncio.to_thread(load_playlist, file_path))
 
-        if not tracks:
-            return f"Playlist '{playlist_name}' is empty"
+    if not tracks:
+        return f"Playlist '{playlist_name}' is empty"
 
-        # Validate position (1-indexed for user-friendliness)
-        if position < 1 or position > len(tracks):
-            return f"Position {position} is out of range. Playlist has {len(tracks)} tracks."
+    # Validate position (1-indexed for user-friendliness; the lower bound is checked by FastMCP)
+    if position > len(tracks):
+        return f"Position {position} is out of range. Playlist has {len(tracks)} tracks."
 
-        # Remove the track (convert to 0-indexed)
-        removed_track = tracks.pop(position - 1)
+    # Remove the track (convert to 0-indexed)
+    removed_track = tracks.pop(position - 1)
 
-        # Write updated playlist back to file
-        with file_path.open('w') as file:
-            json.dump(tracks, file, indent=2)
+    # Write updated playlist back to file
+    await asyncio.to_thread(save_playlist, file_path, tracks)
 
-        title = removed_track.get('title', 'Unknown')
-        artist = removed_track.get('artist', 'Unknown')
+    title = removed_track.get('title', 'Unknown')
+    artist = removed_track.get('artist', 'Unknown')
 
-        return f"Removed track {position}: {title} by {artist} from playlist '{playlist_name}'"
-    except Exception as e:
-        return f"Failed to remove track from playlist: {str(e)}"
+    return f"Removed track {position}: {title} by {artist} from playlist '{playlist_name}'"
 
 
 def main():